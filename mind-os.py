@@ -199,8 +199,25 @@ def main():
 
     # Query command
     query_parser = subparsers.add_parser("query", help="Query semantic memory")
-    query_parser.add_argument("text", type=str, help="The query text")
+    query_parser.add_argument("text", type=str, nargs="?", help="The query text")
+    query_parser.add_argument("--mode", choices=["vector", "lexical", "hybrid"], default=None,
+                              help="lexical=BM25 keyword search (no model load), vector=semantic, hybrid=both fused (default from config)")
+    query_parser.add_argument("--batch", metavar="FILE", type=str, default=None,
+                              help="Read JSONL queries ({\"text\", \"top_k\", \"filters\"}) from FILE or '-' for stdin; print JSONL results")
     
+    # Watch command
+    watch_parser = subparsers.add_parser("watch", help="Continuously re-index notes as they change")
+    watch_parser.add_argument("--status", action="store_true", help="Show the watcher's queue depth and index lag")
+
+    # Memory server command
+    subparsers.add_parser("serve", help="Run the warm memory server (keeps model and vector store loaded)")
+
+    # Benchmark command
+    bench_parser = subparsers.add_parser("bench", help="Measure memory engine performance budgets")
+    bench_parser.add_argument("target", choices=["import", "recall"],
+                              help="import=memory_engine import-time budget, recall=recall@k lost by float16/int8 storage")
+    bench_parser.add_argument("--k", type=int, default=10, help="k for recall@k")
+
     # Report command
     subparsers.add_parser("report", help="Generate a narrative AI synthesis of your current growth state")
 
@@ -271,12 +288,35 @@ def main():
         from scripts.memory_engine import sync_memory
         sync_memory()
     elif args.command == "query":
-        from scripts.memory_engine import query_memory
-        query_memory(args.text)
+        if args.batch:
+            from scripts.memory_client import batch_query
+            batch_query(args.batch)
+        elif args.text:
+            from scripts.memory_client import query_memory
+            query_memory(args.text, mode=args.mode)
+        else:
+            print("❌ 请输入查询内容，或使用 --batch <文件|-> 批量查询")
+    elif args.command == "watch":
+        from scripts.memory_watch import show_status, watch
+        if args.status:
+            show_status()
+        else:
+            watch()
+    elif args.command == "serve":
+        from scripts.memory_server import serve
+        serve()
+    elif args.command == "bench":
+        if args.target == "import":
+            from scripts.memory_bench import check_import_budget
+            if not check_import_budget():
+                sys.exit(1)
+        elif args.target == "recall":
+            from scripts.memory_bench import quantization_recall
+            quantization_recall(k=args.k)
     elif args.command == "report":
         generate_narrative_report()
     elif args.command == "capture":
-        from scripts.memory_engine import semantic_route
+        from scripts.memory_client import semantic_route
         semantic_route(args.message)
     elif args.command == "set":
         update_stat(args.dimension, args.score, args.evidence)
@@ -458,7 +498,7 @@ def generate_narrative_report():
 ## 2. 🔍 核心洞察 (Semantic Synthesis)
 """
     # Use retrieval to find recent "captured thoughts" to synthesize themes
-    from scripts.memory_engine import query_memory
+    from scripts.memory_client import query_memory
     recent_thoughts = query_memory("近期发现的潜意识模式与执行瓶颈")
     
     if recent_thoughts:
@@ -141,7 +141,7 @@ def archive_blackboard(summary=None):
     try:
         from scripts.memory_engine import sync_memory
         print("🧠 正在同步到记忆系统...")
-        sync_memory()
+        sync_memory(paths=[archive_path])
     except Exception as e:
         print(f"⚠️ 记忆同步跳过: {e}")
     
@@ -0,0 +1,67 @@
+"""
+Mind-OS 文件质心索引 - 每篇笔记一个池化向量，用于 capture 路由
+
+The chunk index answers "which passage is closest"; routing a new thought
+needs "which note is closest". One mean-pooled, L2-normalised vector per
+note keeps that search small and stops notes with many chunks from
+winning just by having more chances. Maintained by `sync_memory`.
+"""
+import os
+
+import numpy as np
+
+CENTROID_FILE = "./.mind_os/file_centroids.npz"
+
+class CentroidIndex:
+    """path -> unit-length centroid of that note's chunk embeddings."""
+
+    def __init__(self, path=CENTROID_FILE):
+        self.path = path
+        self.paths = []
+        self.matrix = np.zeros((0, 0), dtype=np.float32)
+
+    @classmethod
+    def load(cls, path=CENTROID_FILE):
+        index = cls(path)
+        if os.path.exists(path):
+            with np.load(path, allow_pickle=False) as data:
+                index.paths = [str(p) for p in data["paths"]]
+                index.matrix = data["matrix"].astype(np.float32)
+        return index
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp.npz"
+        np.savez(tmp_path, paths=np.array(self.paths, dtype=str), matrix=self.matrix)
+        os.replace(tmp_path, self.path)
+
+    def remove(self, paths):
+        drop = set(paths)
+        keep = [i for i, p in enumerate(self.paths) if p not in drop]
+        self.paths = [self.paths[i] for i in keep]
+        self.matrix = self.matrix[keep] if len(self.matrix) else self.matrix
+
+    def update(self, path, chunk_vectors):
+        """Set the centroid of `path` from its chunk embeddings."""
+        self.remove([path])
+        if not len(chunk_vectors):
+            return
+        centroid = np.asarray(chunk_vectors, dtype=np.float32).mean(axis=0)
+        norm = np.linalg.norm(centroid)
+        if norm > 0:
+            centroid /= norm
+        if self.matrix.size == 0:
+            self.matrix = centroid[None, :]
+        else:
+            self.matrix = np.vstack([self.matrix, centroid])
+        self.paths.append(path)
+
+    def search(self, query_vector, top_k=3):
+        """Return [(path, cosine)] of the closest notes."""
+        if not self.paths:
+            return []
+        q = np.asarray(query_vector, dtype=np.float32)
+        q = q / (np.linalg.norm(q) or 1.0)
+        scores = self.matrix @ q
+        top = np.argsort(-scores)[:top_k]
+        return [(self.paths[i], float(scores[i])) for i in top]
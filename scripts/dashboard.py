@@ -8,7 +8,7 @@ try:
     import json
     from scripts.radar_gen import get_dynamic_scores, load_config
     from scripts.consistency_check import check_logical_dissonance
-    from scripts.memory_engine import query_memory
+    from scripts.memory_client import query_memory
     from scripts.study_tracker import get_time_stats, get_granular_progress
     from scripts.growth_engine import get_growth_data, generate_1_percent_advice
 except ImportError as e:
@@ -202,8 +202,10 @@ with col2:
     st.write("---")
     st.subheader("🔎 语义记忆检索")
     q = st.text_input("想不起来某个灵感？输入关键词搜索记忆库：", placeholder="例如：社交回避、执行力...")
+    search_mode = st.radio("检索模式", ["lexical", "hybrid", "vector"], horizontal=True,
+                           help="lexical: 关键词即时检索（不加载模型）；hybrid: 关键词+语义融合；vector: 纯语义")
     if q:
-        results = query_memory(q)
+        results = query_memory(q, mode=search_mode)
         if results:
             for r in results:
                 with st.expander(f"📄 {os.path.basename(r.metadata.get('file_path'))}"):
@@ -242,7 +244,7 @@ st.subheader("🧭 快速洞察分类器")
 msg = st.text_area("输入新的思考片段：", placeholder="系统会自动为您分拣到对应的文件...")
 if st.button("提交到系统"):
     if msg:
-        from scripts.memory_engine import semantic_route
+        from scripts.memory_client import semantic_route
         target_file = semantic_route(msg)
         st.success(f"✅ 已成功分拣至：{os.path.basename(target_file)}")
     else:
@@ -0,0 +1,160 @@
+"""
+Mind-OS 嵌入缓存 - 以 (模型名 + 文本) 哈希为键的持久化向量缓存
+
+Every text that goes through FastEmbed is stored once in
+`.mind_os/embedding_cache.sqlite3`. Rebuilding the vector store,
+switching backends or re-running the same query then costs a sqlite
+lookup instead of ONNX inference.
+"""
+import os
+import sqlite3
+import hashlib
+import threading
+from array import array
+from typing import Any, List
+
+from llama_index.core.embeddings import BaseEmbedding
+from llama_index.core.bridge.pydantic import PrivateAttr
+
+CACHE_FILE = "./.mind_os/embedding_cache.sqlite3"
+
+def cache_key(model_name, text, kind="text"):
+    """Content address of one embedding: model + kind (text/query) + exact text."""
+    h = hashlib.sha256()
+    h.update(f"{model_name}\0{kind}\0".encode('utf-8'))
+    h.update(text.encode('utf-8'))
+    return h.hexdigest()
+
+class EmbeddingCache:
+    """sqlite-backed key -> float32 vector store with hit/miss counters."""
+
+    def __init__(self, path=CACHE_FILE):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vec BLOB NOT NULL)"
+            )
+        return self._conn
+
+    def get_many(self, keys):
+        """Return {key: vector} for the keys that are cached."""
+        found = {}
+        with self._lock:
+            conn = self._connect()
+            unique = list(dict.fromkeys(keys))
+            # Stay well below SQLITE_MAX_VARIABLE_NUMBER
+            for i in range(0, len(unique), 500):
+                batch = unique[i:i + 500]
+                marks = ",".join("?" * len(batch))
+                for key, blob in conn.execute(
+                    f"SELECT key, vec FROM embeddings WHERE key IN ({marks})", batch
+                ):
+                    found[key] = array('f', blob).tolist()
+        return found
+
+    def put_many(self, items):
+        """Store (key, vector) pairs."""
+        with self._lock:
+            conn = self._connect()
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vec) VALUES (?, ?)",
+                [(key, array('f', vec).tobytes()) for key, vec in items],
+            )
+            conn.commit()
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
+
+class CachedEmbedding(BaseEmbedding):
+    """Wrap any LlamaIndex embedding so that each text is embedded at most once."""
+
+    _inner: Any = PrivateAttr()
+    _cache: Any = PrivateAttr()
+    _workers: int = PrivateAttr()
+
+    def __init__(self, inner, cache=None, workers=1, **kwargs):
+        super().__init__(
+            model_name=inner.model_name,
+            embed_batch_size=inner.embed_batch_size,
+            **kwargs,
+        )
+        self._inner = inner
+        self._cache = cache or EmbeddingCache()
+        self._workers = workers
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "CachedEmbedding"
+
+    @property
+    def cache(self):
+        return self._cache
+
+    def _lookup(self, texts, kind, compute):
+        keys = [cache_key(self.model_name, t, kind) for t in texts]
+        found = self._cache.get_many(keys)
+        n_missing = sum(1 for k in keys if k not in found)
+        self._cache.hits += len(keys) - n_missing
+        self._cache.misses += n_missing
+        missing = list(dict.fromkeys(k for k in keys if k not in found))
+        if missing:
+            text_of = dict(zip(keys, texts))
+            vectors = compute([text_of[k] for k in missing])
+            fresh = list(zip(missing, vectors))
+            self._cache.put_many(fresh)
+            found.update(fresh)
+        return [found[k] for k in keys]
+
+    def _get_query_embedding(self, query: str) -> List[float]:
+        return self._lookup([query], "query", self._embed_queries)[0]
+
+    async def _aget_query_embedding(self, query: str) -> List[float]:
+        return self._get_query_embedding(query)
+
+    def get_query_embeddings(self, queries: List[str]) -> List[List[float]]:
+        """Embed many queries with a single model call for the cache misses."""
+        return self._lookup(queries, "query", self._embed_queries)
+
+    def _embed_queries(self, queries):
+        model = getattr(self._inner, "_model", None)
+        if model is not None and hasattr(model, "query_embed"):
+            # fastembed takes the whole list and batches internally
+            return [v.tolist() for v in model.query_embed(queries)]
+        return [self._inner.get_query_embedding(q) for q in queries]
+
+    def _get_text_embedding(self, text: str) -> List[float]:
+        return self._get_text_embeddings([text])[0]
+
+    def _get_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+        return self._lookup(texts, "text", self._inner.get_text_embedding_batch)
+
+    def embed_texts(self, texts: List[str]) -> List[List[float]]:
+        """Embed a whole sync's worth of texts in one pass.
+
+        Unlike `get_text_embedding_batch`, the cache misses are not cut into
+        `embed_batch_size` slices first: they go to fastembed as one stream
+        so that `workers` > 1 can fan batches out to worker processes.
+        Results come back in input order.
+        """
+        return self._lookup(texts, "text", self._embed_texts)
+
+    def _embed_texts(self, texts):
+        model = getattr(self._inner, "_model", None)
+        if model is None or not hasattr(model, "embed"):
+            return self._inner.get_text_embedding_batch(texts)
+        embed = model.passage_embed if getattr(self._inner, "doc_embed_type", "default") == "passage" else model.embed
+        # Spawning workers costs a model load each; not worth it for a few batches
+        parallel = self._workers if self._workers != 1 and len(texts) > 2 * self.embed_batch_size else None
+        return [v.tolist() for v in embed(texts, batch_size=self.embed_batch_size, parallel=parallel)]
@@ -0,0 +1,284 @@
+"""
+Mind-OS 平面向量库 - 基于内存映射 NumPy 矩阵的精确检索后端
+
+A drop-in LlamaIndex vector store for personal-sized vaults: one
+row-major matrix (`vectors.<dtype>`, opened with np.memmap) plus a JSON
+sidecar with the text and metadata of each row. Search is an exact top-k
+over a vectorised dot product, so there is no HNSW graph to load and
+recall is exact. Deleted rows are tombstoned until compaction.
+
+Vectors can be stored as float32, float16 or int8 (symmetric scalar
+quantisation with one float32 scale per row in `scales.f32`). With
+`rescore` enabled the compact first pass keeps `rescore_factor * top_k`
+candidates and re-ranks them with the full-precision vectors from the
+embedding cache.
+
+Select it with `vector_store.backend: flat` in config/mind_os_config.yaml.
+"""
+import os
+import json
+from typing import Any, List, Optional
+
+import numpy as np
+from llama_index.core.bridge.pydantic import PrivateAttr
+from llama_index.core.schema import BaseNode, MetadataMode, TextNode
+from llama_index.core.vector_stores.types import (
+    BasePydanticVectorStore,
+    VectorStoreQuery,
+    VectorStoreQueryResult,
+)
+
+FLAT_STORE_DIR = "./.mind_os/flat_store"
+FLAT_STORE_VERSION = 2
+META_FILE = "meta.json"
+SCALES_FILE = "scales.f32"
+BLOCK_ROWS = 65536  # rows up-cast to float32 at a time while scanning
+DTYPES = {"float32": np.float32, "float16": np.float16, "int8": np.int8}
+
+def _normalize(matrix):
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+def quantize(block, dtype):
+    """float32 rows -> (codes, per-row scales or None) for the given storage dtype."""
+    if dtype == "int8":
+        scales = np.abs(block).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        codes = np.clip(np.rint(block / scales[:, None]), -127, 127).astype(np.int8)
+        return codes, scales.astype(np.float32)
+    return block.astype(DTYPES[dtype]), None
+
+def dequantize(codes, scales=None):
+    """Inverse of `quantize` (lossy for float16 / int8)."""
+    out = np.asarray(codes, dtype=np.float32)
+    if scales is not None:
+        out = out * np.asarray(scales, dtype=np.float32)[:, None]
+    return out
+
+def scan_scores(codes, scales, q):
+    """codes @ q for every row, up-casting one block at a time to bound memory."""
+    out = np.empty(len(codes), dtype=np.float32)
+    for start in range(0, len(codes), BLOCK_ROWS):
+        out[start:start + BLOCK_ROWS] = np.asarray(codes[start:start + BLOCK_ROWS], dtype=np.float32) @ q
+    if scales is not None:
+        out *= scales
+    return out
+
+class FlatVectorStore(BasePydanticVectorStore):
+    """Exact cosine search over a memory-mapped (optionally quantised) matrix."""
+
+    stores_text: bool = True
+    is_embedding_query: bool = True
+    persist_dir: str = FLAT_STORE_DIR
+    dtype: str = "float32"
+    rescore: bool = False
+    rescore_factor: int = 4
+    embed_model_name: Optional[str] = None
+
+    _dim: Optional[int] = PrivateAttr(default=None)
+    _rows: List[dict] = PrivateAttr(default_factory=list)   # node_id, ref_doc_id, text, metadata, deleted
+    _row_of: dict = PrivateAttr(default_factory=dict)       # node_id -> row
+    _codes: Any = PrivateAttr(default=None)
+    _scales: Any = PrivateAttr(default=None)
+    _pending: List[Any] = PrivateAttr(default_factory=list)  # (codes, scales) not yet flushed
+    _dirty: bool = PrivateAttr(default=False)
+
+    def __init__(self, persist_dir=FLAT_STORE_DIR, **kwargs):
+        super().__init__(persist_dir=persist_dir, **kwargs)
+        if self.dtype not in DTYPES:
+            raise ValueError(f"Unknown vector_store.dtype: {self.dtype} (expected {', '.join(DTYPES)})")
+        meta_path = os.path.join(persist_dir, META_FILE)
+        if os.path.exists(meta_path):
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta.get("version") == FLAT_STORE_VERSION and meta.get("dtype") == self.dtype:
+                self._dim = meta["dim"]
+                self._rows = meta["rows"]
+                self._row_of = {r["node_id"]: i for i, r in enumerate(self._rows) if not r["deleted"]}
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "FlatVectorStore"
+
+    @property
+    def client(self) -> Any:
+        return None
+
+    # --- storage -------------------------------------------------------
+    def _vectors_path(self):
+        return os.path.join(self.persist_dir, f"vectors.{self.dtype}")
+
+    def _scales_path(self):
+        return os.path.join(self.persist_dir, SCALES_FILE)
+
+    def _flushed_rows(self):
+        return len(self._rows) - sum(len(codes) for codes, _ in self._pending)
+
+    def codes(self):
+        """(codes, scales) for all rows including tombstones; scales is None unless int8."""
+        if self._codes is None:
+            n = self._flushed_rows()
+            dt = DTYPES[self.dtype]
+            if n and self._dim:
+                # Rows beyond the sidecar (an interrupted write) are simply ignored
+                self._codes = np.memmap(self._vectors_path(), dtype=dt, mode='r', shape=(n, self._dim))
+                if self.dtype == "int8":
+                    self._scales = np.memmap(self._scales_path(), dtype=np.float32, mode='r', shape=(n,))
+            else:
+                self._codes = np.zeros((0, self._dim or 0), dtype=dt)
+                self._scales = np.zeros(0, dtype=np.float32) if self.dtype == "int8" else None
+        codes, scales = self._codes, self._scales
+        if self._pending:
+            codes = np.concatenate([np.asarray(codes)] + [c for c, _ in self._pending])
+            if scales is not None:
+                scales = np.concatenate([np.asarray(scales)] + [s for _, s in self._pending])
+        return codes, scales
+
+    def vectors(self):
+        """All rows de-quantised to float32 (tombstones included; see `live_rows`)."""
+        return dequantize(*self.codes())
+
+    def live_rows(self):
+        """Indices of rows that are not tombstoned."""
+        return np.array(sorted(self._row_of.values()), dtype=np.int64)
+
+    def export(self, full_precision=False):
+        """(node_ids, float32 matrix, metadatas) of live rows.
+
+        With `full_precision`, rows are taken from the embedding cache where
+        available instead of being de-quantised.
+        """
+        live = self.live_rows()
+        codes, scales = self.codes()
+        matrix = dequantize(codes[live], scales[live] if scales is not None else None)
+        if full_precision and self.dtype != "float32":
+            from scripts.embedding_cache import EmbeddingCache
+            keys = [self._rows[i].get("embed_key") for i in live]
+            found = EmbeddingCache().get_many([k for k in keys if k])
+            for j, key in enumerate(keys):
+                if key in found:
+                    matrix[j] = found[key]
+        matrix = _normalize(matrix)
+        return ([self._rows[i]["node_id"] for i in live], matrix,
+                [self._rows[i]["metadata"] for i in live])
+
+    def nbytes(self):
+        """On-disk size of the vector payload (codes + scales)."""
+        codes, scales = self.codes()
+        return codes.nbytes + (scales.nbytes if scales is not None else 0)
+
+    def _append(self, path, blocks, flushed, itemsize):
+        with open(path, 'r+b' if os.path.exists(path) else 'wb') as f:
+            # Truncate any tail left by an interrupted write before appending
+            f.truncate(flushed * itemsize)
+            f.seek(0, os.SEEK_END)
+            for block in blocks:
+                f.write(np.ascontiguousarray(block).tobytes())
+
+    def persist(self, persist_path: Optional[str] = None, fs: Any = None) -> None:
+        """Append pending vectors and rewrite the sidecar atomically."""
+        if not self._dirty:
+            return
+        os.makedirs(self.persist_dir, exist_ok=True)
+        flushed = self._flushed_rows()
+        row_bytes = (self._dim or 0) * np.dtype(DTYPES[self.dtype]).itemsize
+        self._append(self._vectors_path(), [c for c, _ in self._pending], flushed, row_bytes)
+        if self.dtype == "int8":
+            self._append(self._scales_path(), [s for _, s in self._pending], flushed, 4)
+        self._pending = []
+        self._codes = self._scales = None
+        meta_path = os.path.join(self.persist_dir, META_FILE)
+        tmp_path = meta_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": FLAT_STORE_VERSION, "dim": self._dim, "dtype": self.dtype,
+                       "rows": self._rows}, f, ensure_ascii=False)
+        os.replace(tmp_path, meta_path)
+        self._dirty = False
+
+    # --- BasePydanticVectorStore API -----------------------------------
+    def add(self, nodes: List[BaseNode], **add_kwargs: Any) -> List[str]:
+        if not nodes:
+            return []
+        block = _normalize(np.asarray([n.get_embedding() for n in nodes], dtype=np.float32))
+        if self._dim is None:
+            self._dim = block.shape[1]
+        ids = []
+        for node in nodes:
+            if node.node_id in self._row_of:
+                self._rows[self._row_of[node.node_id]]["deleted"] = True
+            self._row_of[node.node_id] = len(self._rows)
+            row = {
+                "node_id": node.node_id,
+                "ref_doc_id": node.ref_doc_id,
+                "text": node.get_content(),
+                "metadata": node.metadata,
+                "deleted": False,
+            }
+            if self.embed_model_name:
+                # Address of the full-precision vector in the embedding cache (for rescoring)
+                from scripts.embedding_cache import cache_key
+                row["embed_key"] = cache_key(
+                    self.embed_model_name, node.get_content(metadata_mode=MetadataMode.EMBED)
+                )
+            self._rows.append(row)
+            ids.append(node.node_id)
+        self._pending.append(quantize(block, self.dtype))
+        self._dirty = True
+        return ids
+
+    def delete(self, ref_doc_id: str, **delete_kwargs: Any) -> None:
+        for row in self._rows:
+            if not row["deleted"] and row["ref_doc_id"] == ref_doc_id:
+                row["deleted"] = True
+                self._row_of.pop(row["node_id"], None)
+                self._dirty = True
+
+    def delete_nodes(self, node_ids: Optional[List[str]] = None, filters: Any = None,
+                     **delete_kwargs: Any) -> None:
+        for node_id in node_ids or []:
+            row = self._row_of.pop(node_id, None)
+            if row is not None:
+                self._rows[row]["deleted"] = True
+                self._dirty = True
+
+    def _filter_mask(self, filters):
+        mask = np.array([not r["deleted"] for r in self._rows], dtype=bool)
+        if filters is not None:
+            for f in filters.filters:
+                mask &= np.array([r["metadata"].get(f.key) == f.value for r in self._rows], dtype=bool)
+        return mask
+
+    def _rescore(self, candidates, scores, q):
+        """Replace compact scores of `candidates` with full-precision ones from the embedding cache."""
+        from scripts.embedding_cache import EmbeddingCache
+        keys = [self._rows[i].get("embed_key") for i in candidates]
+        found = EmbeddingCache().get_many([k for k in keys if k])
+        for i, key in zip(candidates, keys):
+            if key in found:
+                scores[i] = float(_normalize(np.asarray(found[key], dtype=np.float32)) @ q)
+
+    def query(self, query: VectorStoreQuery, **kwargs: Any) -> VectorStoreQueryResult:
+        if not self._row_of or query.query_embedding is None:
+            return VectorStoreQueryResult(nodes=[], similarities=[], ids=[])
+        q = _normalize(np.asarray(query.query_embedding, dtype=np.float32))
+        scores = scan_scores(*self.codes(), q)
+        scores = np.where(self._filter_mask(query.filters), scores, -np.inf)
+        n_valid = int(np.isfinite(scores).sum())
+        k = min(query.similarity_top_k, n_valid)
+        if k <= 0:
+            return VectorStoreQueryResult(nodes=[], similarities=[], ids=[])
+        if self.rescore and self.dtype != "float32":
+            depth = min(k * self.rescore_factor, n_valid)
+            candidates = np.argpartition(-scores, depth - 1)[:depth]
+            self._rescore(candidates, scores, q)
+            scores = np.where(np.isin(np.arange(len(scores)), candidates), scores, -np.inf)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        nodes, sims, ids = [], [], []
+        for i in top:
+            row = self._rows[i]
+            nodes.append(TextNode(id_=row["node_id"], text=row["text"], metadata=row["metadata"]))
+            sims.append(float(scores[i]))
+            ids.append(row["node_id"])
+        return VectorStoreQueryResult(nodes=nodes, similarities=sims, ids=ids)
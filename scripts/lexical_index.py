@@ -0,0 +1,120 @@
+"""
+Mind-OS 词法索引 - 面向中英混排笔记的 BM25 倒排索引
+
+Chinese runs are split into overlapping character bigrams, latin text
+into lower-cased words, so exact-term lookups work without the English
+embedding model. The index is a plain JSON file rebuilt incrementally by
+`sync_memory`; searching it never loads the ONNX model or Chroma.
+"""
+import os
+import re
+import json
+import math
+from collections import Counter, defaultdict
+
+LEXICAL_FILE = "./.mind_os/lexical_index.json"
+LEXICAL_VERSION = 1
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+_TOKEN_RE = re.compile(r"[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+|[a-z0-9_]+")
+_CJK_RE = re.compile(r"[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]")
+
+def tokenize(text):
+    """CJK runs -> character bigrams (single chars kept as-is); latin -> words."""
+    tokens = []
+    for run in _TOKEN_RE.findall(text.lower()):
+        if _CJK_RE.match(run):
+            if len(run) == 1:
+                tokens.append(run)
+            else:
+                tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+        else:
+            tokens.append(run)
+    return tokens
+
+class LexicalIndex:
+    """BM25 over chunks. Persisted as per-chunk term counts; postings are rebuilt on load."""
+
+    def __init__(self, path=LEXICAL_FILE):
+        self.path = path
+        self.docs = {}          # node_id -> {"text", "metadata", "tf", "len"}
+        self._postings = None   # term -> {node_id: tf}, built lazily
+
+    @classmethod
+    def load(cls, path=LEXICAL_FILE):
+        index = cls(path)
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") == LEXICAL_VERSION:
+                index.docs = data.get("docs", {})
+        return index
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": LEXICAL_VERSION, "docs": self.docs}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def add(self, node_id, text, metadata):
+        tf = Counter(tokenize(text))
+        self.docs[node_id] = {
+            "text": text,
+            "metadata": metadata,
+            "tf": dict(tf),
+            "len": sum(tf.values()),
+        }
+        self._postings = None
+
+    def remove_ids(self, node_ids):
+        """Drop the given chunks (unknown ids are ignored)."""
+        removed = 0
+        for nid in node_ids:
+            if self.docs.pop(nid, None) is not None:
+                removed += 1
+        if removed:
+            self._postings = None
+        return removed
+
+    def _build_postings(self):
+        postings = defaultdict(dict)
+        for nid, d in self.docs.items():
+            for term, count in d["tf"].items():
+                postings[term][nid] = count
+        self._postings = postings
+
+    def search(self, query, top_k=5, filters=None):
+        """Return [(node_id, score)] ranked by BM25, honouring exact-match `filters`."""
+        if not self.docs:
+            return []
+        if self._postings is None:
+            self._build_postings()
+        n_docs = len(self.docs)
+        avg_len = sum(d["len"] for d in self.docs.values()) / n_docs or 1.0
+        scores = defaultdict(float)
+        for term in set(tokenize(query)):
+            posting = self._postings.get(term)
+            if not posting:
+                continue
+            idf = math.log(1 + (n_docs - len(posting) + 0.5) / (len(posting) + 0.5))
+            for nid, tf in posting.items():
+                doc_len = self.docs[nid]["len"]
+                norm = tf + BM25_K1 * (1 - BM25_B + BM25_B * doc_len / avg_len)
+                scores[nid] += idf * tf * (BM25_K1 + 1) / norm
+        if filters:
+            scores = {nid: s for nid, s in scores.items()
+                      if all(self.docs[nid]["metadata"].get(k) == v for k, v in filters.items())}
+        return sorted(scores.items(), key=lambda x: x[1], reverse=True)[:top_k]
+
+def reciprocal_rank_fusion(rankings, k=60):
+    """Fuse several ranked id lists into one [(id, score)] list (RRF)."""
+    fused = defaultdict(float)
+    for ranking in rankings:
+        for rank, nid in enumerate(ranking):
+            fused[nid] += 1.0 / (k + rank + 1)
+    return sorted(fused.items(), key=lambda x: x[1], reverse=True)
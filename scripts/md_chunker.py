@@ -0,0 +1,102 @@
+"""
+Mind-OS Markdown 切分器 - 按 frontmatter 与标题边界切分笔记
+
+Each chunk is one heading section (or the YAML frontmatter), carries its
+heading path as metadata and gets an id derived from its own content.
+Appending a `### 📝 AI Captured` or `### 📈 ... 变动记录` block therefore
+adds one new chunk and leaves every earlier chunk id unchanged, so sync
+only embeds the new tail.
+"""
+import re
+import hashlib
+
+import yaml
+
+MAX_CHUNK_CHARS = 1500  # longer sections are split further at paragraph boundaries
+_HEADING_RE = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+_FENCE_RE = re.compile(r"^\s*(```|~~~)")
+
+def split_frontmatter(text):
+    """Return (frontmatter_text or None, parsed dict, body)."""
+    if text.startswith("---"):
+        parts = text.split("\n")
+        for i in range(1, len(parts)):
+            if parts[i].strip() == "---":
+                raw = "\n".join(parts[1:i])
+                try:
+                    meta = yaml.safe_load(raw) or {}
+                except yaml.YAMLError:
+                    meta = {}
+                return raw, meta if isinstance(meta, dict) else {}, "\n".join(parts[i + 1:])
+    return None, {}, text
+
+def _sections(body):
+    """Yield (heading_path, section_text) split at ATX headings outside code fences."""
+    stack = []  # [(level, title)]
+    lines, in_fence = [], False
+    path = ""
+    for line in body.split("\n"):
+        if _FENCE_RE.match(line):
+            in_fence = not in_fence
+        m = None if in_fence else _HEADING_RE.match(line)
+        if m:
+            if lines:
+                yield path, "\n".join(lines)
+            level, title = len(m.group(1)), m.group(2)
+            stack = [(l, t) for l, t in stack if l < level] + [(level, title)]
+            path = " > ".join(t for _, t in stack)
+            lines = [line]
+        else:
+            lines.append(line)
+    if lines:
+        yield path, "\n".join(lines)
+
+def _split_long(text, limit=MAX_CHUNK_CHARS):
+    """Split an oversized section at blank lines, then hard-wrap what is still too long."""
+    if len(text) <= limit:
+        return [text]
+    pieces, current = [], ""
+    for para in re.split(r"\n\s*\n", text):
+        candidate = f"{current}\n\n{para}" if current else para
+        if len(candidate) <= limit:
+            current = candidate
+            continue
+        if current:
+            pieces.append(current)
+        while len(para) > limit:
+            pieces.append(para[:limit])
+            para = para[limit:]
+        current = para
+    if current:
+        pieces.append(current)
+    return pieces
+
+def content_hash(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]
+
+def chunk_markdown(path, text):
+    """Split one note into chunk dicts: {id, text, hash, heading_path}.
+
+    The id depends only on the file path, the chunk text and how many
+    identical chunks precede it in the same file, so unchanged sections keep
+    their ids however the rest of the file changes.
+    """
+    frontmatter, _, body = split_frontmatter(text)
+    raw = []
+    if frontmatter and frontmatter.strip():
+        raw.append(("frontmatter", frontmatter.strip()))
+    for heading_path, section in _sections(body):
+        section = section.strip()
+        if section:
+            raw.extend((heading_path, piece.strip()) for piece in _split_long(section))
+    chunks, seen = [], {}
+    for heading_path, chunk_text in raw:
+        if not chunk_text:
+            continue
+        digest = content_hash(chunk_text)
+        occurrence = seen.get(digest, 0)
+        seen[digest] = occurrence + 1
+        chunk_id = hashlib.sha1(f"{path}\0{digest}\0{occurrence}".encode('utf-8')).hexdigest()
+        chunks.append({"id": chunk_id, "text": chunk_text, "hash": digest,
+                       "heading_path": heading_path})
+    return chunks
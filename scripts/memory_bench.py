@@ -0,0 +1,100 @@
+"""
+Mind-OS 记忆引擎基准 - 防止性能回退的可测量预算
+
+`python mind-os.py bench import` imports `scripts.memory_engine` in fresh
+interpreters and fails when it is slower than IMPORT_BUDGET_MS or when the
+import pulls in a heavy dependency that should only load on first use.
+
+`python mind-os.py bench recall` measures the recall@k lost by storing
+vectors as float16 / int8 instead of float32, with and without rescoring.
+"""
+import os
+import sys
+import json
+import statistics
+import subprocess
+
+import numpy as np
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+IMPORT_BUDGET_MS = 150
+HEAVY_MODULES = ["llama_index", "chromadb", "fastembed", "onnxruntime", "numpy"]
+
+_PROBE = """
+import json, sys, time
+t = time.perf_counter()
+import {module}
+elapsed = (time.perf_counter() - t) * 1000
+heavy = sorted({{m.split('.')[0] for m in sys.modules}} & set({heavy!r}))
+print(json.dumps({{"ms": elapsed, "heavy": heavy}}))
+"""
+
+def measure_import(module="scripts.memory_engine", runs=5):
+    """Median cold import time (ms) over `runs` fresh interpreters, plus heavy modules seen."""
+    code = _PROBE.format(module=module, heavy=HEAVY_MODULES)
+    timings, heavy = [], set()
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", code], cwd=PROJECT_ROOT,
+            capture_output=True, text=True, check=True,
+        ).stdout
+        sample = json.loads(out.strip().splitlines()[-1])
+        timings.append(sample["ms"])
+        heavy.update(sample["heavy"])
+    return statistics.median(timings), sorted(heavy)
+
+def check_import_budget(module="scripts.memory_engine", budget_ms=IMPORT_BUDGET_MS, runs=5):
+    """Print the measured import time; return True when it is within budget."""
+    median_ms, heavy = measure_import(module, runs)
+    ok = median_ms <= budget_ms and not heavy
+    status = "✅" if ok else "❌"
+    print(f"{status} import {module}: {median_ms:.1f} ms (budget {budget_ms} ms, median of {runs})")
+    if heavy:
+        print(f"   ⚠️ Heavy modules loaded at import time: {', '.join(heavy)}")
+    return ok
+
+def _top_k(scores, k):
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top])]
+
+def quantization_recall(k=10, n_queries=200, rescore_factor=4, seed=0):
+    """Recall@k of each storage dtype against exact float32 search over the current index.
+
+    Queries are a random sample of stored chunk vectors; ground truth is the
+    exact float32 top-k (full-precision vectors come from the embedding cache).
+    """
+    from scripts.memory_engine import get_engine
+    from scripts.flat_store import quantize, scan_scores
+
+    _, base, _ = get_engine().all_vectors(full_precision=True)
+    if len(base) == 0:
+        print("⚠️ The index is empty. Run `python mind-os.py sync` first.")
+        return {}
+    k = min(k, len(base))
+    depth = min(k * rescore_factor, len(base))
+    rng = np.random.default_rng(seed)
+    queries = base[rng.choice(len(base), min(n_queries, len(base)), replace=False)]
+    truth = [set(_top_k(base @ q, k)) for q in queries]
+
+    print(f"📏 recall@{k} over {len(queries)} queries, {len(base)} vectors (dim {base.shape[1]})")
+    print(f"{'dtype':<8} {'bytes/vec':>9} {'size':>6} {'recall':>8} {'rescored':>9}")
+    results = {}
+    for dtype in ("float32", "float16", "int8"):
+        codes, scales = quantize(base, dtype)
+        row_bytes = codes.nbytes / len(codes) + (4 if scales is not None else 0)
+        hits = hits_rescored = 0
+        for q, expected in zip(queries, truth):
+            scores = scan_scores(codes, scales, q)
+            hits += len(expected & set(_top_k(scores, k)))
+            candidates = _top_k(scores, depth)
+            exact = base[candidates] @ q
+            hits_rescored += len(expected & set(candidates[_top_k(exact, k)]))
+        total = k * len(queries)
+        results[dtype] = {"bytes_per_vector": row_bytes, "recall": hits / total,
+                          "recall_rescored": hits_rescored / total}
+        print(f"{dtype:<8} {row_bytes:>9.0f} {row_bytes / (base.shape[1] * 4):>5.2f}x "
+              f"{hits / total:>8.4f} {hits_rescored / total:>9.4f}")
+    return results
+
+if __name__ == "__main__":
+    sys.exit(0 if check_import_budget() else 1)
@@ -0,0 +1,160 @@
+"""
+Mind-OS 记忆客户端 - 优先连接常驻记忆服务，不可用时回退到进程内检索
+
+This module must stay cheap to import: it never touches llama_index,
+chromadb or the embedding model unless it has to fall back.
+"""
+import os
+import sys
+import json
+import socket
+import yaml
+
+CONFIG_FILE = "config/mind_os_config.yaml"
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+BATCH_QUERY_SIZE = 256  # queries embedded together per model call
+
+class MemoryHit:
+    """Minimal stand-in for a LlamaIndex NodeWithScore (server, lexical and hybrid results)."""
+
+    def __init__(self, text, metadata=None, score=None, node_id=None):
+        self.text = text
+        self.metadata = metadata or {}
+        self.score = score
+        self.node_id = node_id
+
+def load_config_section(name):
+    """Read one top-level section of the global config."""
+    config_path = os.path.join(os.path.dirname(__file__), '..', CONFIG_FILE)
+    if os.path.exists(config_path):
+        with open(config_path, 'r', encoding='utf-8') as f:
+            config = yaml.safe_load(f) or {}
+        return config.get(name, {}) or {}
+    return {}
+
+def load_server_config():
+    """Read the `memory_server` section of the global config."""
+    return load_config_section('memory_server')
+
+def default_query_mode():
+    """`retrieval.default_mode` from the config (vector | lexical | hybrid)."""
+    return load_config_section('retrieval').get('default_mode', 'hybrid')
+
+def server_address():
+    cfg = load_server_config()
+    return cfg.get('host', DEFAULT_HOST), int(cfg.get('port', DEFAULT_PORT))
+
+def send_request(payload, timeout=None):
+    """Send one JSON request to the memory server; return the reply or None if unreachable."""
+    cfg = load_server_config()
+    if cfg.get('enabled') is False:
+        return None
+    connect_timeout = timeout if timeout is not None else float(cfg.get('connect_timeout', 0.2))
+    try:
+        with socket.create_connection(server_address(), timeout=connect_timeout) as sock:
+            # Queries may legitimately take longer than the connect probe
+            sock.settimeout(float(cfg.get('request_timeout', 120)))
+            sock.sendall(json.dumps(payload, ensure_ascii=False).encode('utf-8') + b"\n")
+            with sock.makefile('r', encoding='utf-8') as reader:
+                line = reader.readline()
+    except OSError:
+        return None
+    if not line:
+        return None
+    reply = json.loads(line)
+    if not reply.get("ok"):
+        raise RuntimeError(f"Memory server error: {reply.get('error')}")
+    return reply
+
+def print_nodes(nodes):
+    """Human-readable retrieval output shared by local and remote queries."""
+    print("\n--- Memory Retrieval Result ---")
+    if not nodes:
+        print("No relevant memories found.")
+    else:
+        for i, node in enumerate(nodes):
+            print(f"[{i+1}] Source: {node.metadata.get('file_path', 'Unknown')}")
+            print(f"    Content: {node.text[:200]}...")
+            print("-" * 30)
+    print("-------------------------------\n")
+
+def query_memory(query_str, top_k=5, mode=None):
+    """Query via the warm server when it is running, otherwise in-process.
+
+    Lexical queries always run in-process: they only read the BM25 index.
+    """
+    mode = mode or default_query_mode()
+    reply = None
+    if mode != "lexical":
+        reply = send_request({"op": "query", "text": query_str, "top_k": top_k, "mode": mode})
+    if reply is None:
+        from scripts.memory_engine import query_memory as local_query
+        return local_query(query_str, mode=mode)
+    print(f"🔎 Querying memory for: '{query_str}' ({mode}, via memory server)")
+    nodes = [MemoryHit(r["text"], r.get("metadata"), r.get("score"), r.get("node_id"))
+             for r in reply["results"]]
+    print_nodes(nodes)
+    return nodes
+
+def semantic_route(message):
+    """Route a captured thought via the warm server when it is running, otherwise in-process."""
+    reply = send_request({"op": "route", "message": message})
+    if reply is None:
+        from scripts.memory_engine import semantic_route as local_route
+        return local_route(message)
+    target_file = reply["target_file"]
+    print(f"✅ Thought appended to {os.path.basename(target_file)} (via memory server)")
+    return target_file
+
+def _flush_batch(batch, out):
+    queries = [q for _, q in batch]
+    reply = send_request({"op": "batch", "queries": queries})
+    if reply is None:
+        from scripts.memory_engine import retrieve_batch
+        results = retrieve_batch(queries)
+    else:
+        results = reply["results"]
+    for (qid, _), hits in zip(batch, results):
+        out.write(json.dumps({"id": qid, "results": hits}, ensure_ascii=False) + "\n")
+    out.flush()
+
+def batch_query(source, out=None):
+    """Answer JSONL queries (`{"text", "top_k", "filters"}`) from a file or '-' for stdin.
+
+    Each output line is `{"id", "results": [{"path", "score", "text"}]}`;
+    `id` echoes the request's `id` or defaults to its line number.
+    """
+    out = out or sys.stdout
+    stream = sys.stdin if source in (None, "-") else open(source, 'r', encoding='utf-8')
+    batch = []
+    try:
+        for lineno, line in enumerate(stream, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                query = json.loads(line)
+                if not isinstance(query, dict) or not query.get("text"):
+                    raise ValueError("missing 'text'")
+            except ValueError as e:
+                if batch:  # keep output in input order
+                    _flush_batch(batch, out)
+                    batch = []
+                out.write(json.dumps({"id": lineno, "error": str(e)}, ensure_ascii=False) + "\n")
+                continue
+            query.setdefault("mode", default_query_mode())
+            batch.append((query.pop("id", lineno), query))
+            if len(batch) >= BATCH_QUERY_SIZE:
+                _flush_batch(batch, out)
+                batch = []
+        if batch:
+            _flush_batch(batch, out)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+def server_status():
+    """Return the server's status dict, or None when no server is listening."""
+    reply = send_request({"op": "ping"})
+    return reply.get("status") if reply else None
@@ -1,116 +1,556 @@
+"""
+Mind-OS 记忆引擎 - 本地笔记的增量向量索引与语义检索
+
+Importing this module is cheap: llama_index, chromadb and the FastEmbed
+ONNX model are only loaded the first time `get_engine()` needs them.
+Keep it that way (`python mind-os.py bench import` checks the budget).
+"""
 import os
-import logging
 import sys
-from llama_index.core import (
-    VectorStoreIndex,
-    SimpleDirectoryReader,
-    StorageContext,
-    load_index_from_storage,
-    Settings
-)
-from llama_index.vector_stores.chroma import ChromaVectorStore
-from llama_index.embeddings.fastembed import FastEmbedEmbedding
-import chromadb
+import json
+import hashlib
+import threading
+import time
 import yaml
 
-# Load Config
-def load_config():
-    config_path = os.path.join(os.path.dirname(__file__), '..', 'config', 'mind_os_config.yaml')
-    with open(config_path, 'r', encoding='utf-8') as f:
-        return yaml.safe_load(f)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))  # allow `python scripts/memory_engine.py`
 
-CONFIG = load_config()
 PERSIST_DIR = "./.mind_os/vector_store"
 LOGS_DIR = "." # Root of the project to scan everything
+COLLECTION_NAME = "mind_os_memory"
+MANIFEST_FILE = "./.mind_os/sync_manifest.json"
+MANIFEST_VERSION = 3  # bump when an index format changes; older manifests trigger a re-index
 
-# Global Settings for Offline Operation
 # BAAI/bge-small-en-v1.5 is the default for FastEmbed, 
 # for Chinese we can use BAAI/bge-small-zh-v1.5 if needed,
 # but FastEmbed default is usually okay for mixed content.
-Settings.embed_model = FastEmbedEmbedding(model_name="BAAI/bge-small-en-v1.5")
-Settings.llm = None # Disable LLM for now, we just need retrieval
-
-def setup_engine():
-    # Setup ChromaDB
-    db = chromadb.PersistentClient(path=PERSIST_DIR)
-    chroma_collection = db.get_or_create_collection("mind_os_memory")
-    vector_store = ChromaVectorStore(chroma_collection=chroma_collection)
-    storage_context = StorageContext.from_defaults(vector_store=vector_store)
-    
-    return storage_context
+EMBED_MODEL_NAME = "BAAI/bge-small-en-v1.5"
+
+QUERY_MODES = ("vector", "lexical", "hybrid")
+HYBRID_DEPTH = 4  # each ranking contributes top_k * HYBRID_DEPTH candidates to the fusion
+ROUTE_CANDIDATES = 3
+INBOX_FILE = "增量引擎/收集箱.md"  # fallback destination for low-confidence captures
+DEFAULT_EXTRA_DIRS = ["对话记录", "增量引擎"]  # indexed besides `directories`
+ROUTE_MIN_SCORE = 0.5  # default for routing.min_score
+
+# Load Config
+def load_config():
+    config_path = os.path.join(os.path.dirname(__file__), '..', 'config', 'mind_os_config.yaml')
+    with open(config_path, 'r', encoding='utf-8') as f:
+        return yaml.safe_load(f)
+
+class MemoryEngine:
+    """Process-wide, lazily created handles for the config, embedder and vector store.
+
+    query_memory, semantic_route, sync_memory and the memory server all
+    share one instance (see `get_engine()`), so the model and the Chroma
+    client are built at most once per process.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._config = None
+        self._embed_model = None
+        self._vector_store = None
+        self._lexical = None
+        self._centroids = None
+        self._stamp = None
+
+    @property
+    def config(self):
+        if self._config is None:
+            self._config = load_config() or {}
+        return self._config
+
+    @property
+    def embed_model(self):
+        with self._lock:
+            if self._embed_model is None:
+                from llama_index.core import Settings
+                from llama_index.embeddings.fastembed import FastEmbedEmbedding
+                from scripts.embedding_cache import CachedEmbedding, EmbeddingCache
+                cfg = self.embedding_config
+                self._embed_model = CachedEmbedding(
+                    FastEmbedEmbedding(
+                        model_name=EMBED_MODEL_NAME,
+                        embed_batch_size=int(cfg.get('batch_size') or 256),
+                        threads=cfg.get('threads'),
+                    ),
+                    EmbeddingCache(),
+                    workers=int(cfg.get('workers', 1)),
+                )
+                # Global Settings for Offline Operation
+                Settings.embed_model = self._embed_model
+                Settings.llm = None # Disable LLM for now, we just need retrieval
+            return self._embed_model
+
+    @property
+    def embedding_config(self):
+        """`embedding` section: batch_size, threads (ONNX per process), workers."""
+        return self.config.get('embedding') or {}
+
+    @property
+    def store_config(self):
+        return self.config.get('vector_store') or {}
+
+    @property
+    def backend(self):
+        """`vector_store.backend` from the config: chroma (default) or flat."""
+        return self.store_config.get('backend', 'chroma')
+
+    @property
+    def store_signature(self):
+        """Identifies the on-disk vector format; a change forces a re-index."""
+        dtype = self.store_config.get('dtype', 'float32')
+        if self.backend == "flat" and dtype != "float32":
+            return f"flat/{dtype}"
+        return self.backend
+
+    def open_vector_store(self, reset=False):
+        """Open the configured vector store; `reset` drops its contents first."""
+        if self.backend == "flat":
+            from scripts.flat_store import FLAT_STORE_DIR, FlatVectorStore
+            if reset and os.path.exists(FLAT_STORE_DIR):
+                import shutil
+                shutil.rmtree(FLAT_STORE_DIR)
+            cfg = self.store_config
+            return FlatVectorStore(
+                persist_dir=FLAT_STORE_DIR,
+                dtype=cfg.get('dtype', 'float32'),
+                rescore=bool(cfg.get('rescore', False)),
+                rescore_factor=int(cfg.get('rescore_factor', 4)),
+                embed_model_name=EMBED_MODEL_NAME,
+            )
+        if self.backend != "chroma":
+            raise ValueError(f"Unknown vector_store.backend: {self.backend} (expected chroma or flat)")
+        import chromadb
+        from llama_index.vector_stores.chroma import ChromaVectorStore
+        db = chromadb.PersistentClient(path=PERSIST_DIR)
+        if reset:
+            # No manifest yet: the collection may hold duplicates from the old
+            # full re-index, so start from a clean slate.
+            try:
+                db.delete_collection(COLLECTION_NAME)
+            except Exception:
+                pass
+        chroma_collection = db.get_or_create_collection(COLLECTION_NAME)
+        return ChromaVectorStore(chroma_collection=chroma_collection)
+
+    @property
+    def vector_store(self):
+        with self._lock:
+            if self._vector_store is None:
+                self._vector_store = self.open_vector_store()
+                self._stamp = index_stamp()
+            return self._vector_store
+
+    @property
+    def lexical(self):
+        """BM25 index over the same chunks; loading it never touches the model."""
+        with self._lock:
+            if self._lexical is None:
+                from scripts.lexical_index import LexicalIndex
+                self._lexical = LexicalIndex.load()
+                if self._stamp is None:
+                    self._stamp = index_stamp()
+            return self._lexical
+
+    def all_vectors(self, full_precision=False):
+        """(node_ids, float32 matrix, metadatas) of every chunk in the store."""
+        if self.backend == "flat":
+            return self.vector_store.export(full_precision)
+        import numpy as np
+        data = self.vector_store.client.get(include=["embeddings", "metadatas"])
+        matrix = np.asarray(data["embeddings"], dtype=np.float32).reshape(len(data["ids"]), -1)
+        return list(data["ids"]), matrix, list(data["metadatas"])
+
+    @property
+    def centroids(self):
+        """One pooled vector per note, used by semantic_route."""
+        with self._lock:
+            if self._centroids is None:
+                from scripts.centroid_index import CentroidIndex
+                self._centroids = CentroidIndex.load()
+                if self._stamp is None:
+                    self._stamp = index_stamp()
+            return self._centroids
+
+    def reset(self):
+        """Forget the open store so the next call re-opens it."""
+        with self._lock:
+            self._vector_store = None
+            self._lexical = None
+            self._centroids = None
+            self._stamp = None
+            if "chromadb" in sys.modules:
+                try:
+                    # Chroma caches one client per path; drop it to see other processes' writes
+                    from chromadb.api.client import SharedSystemClient
+                    SharedSystemClient.clear_system_cache()
+                except Exception:
+                    pass
+
+    def refresh_if_stale(self):
+        """Re-open the store when another process (e.g. `sync`) has updated it."""
+        opened = any(h is not None for h in (self._vector_store, self._lexical, self._centroids))
+        if opened and index_stamp() != self._stamp:
+            self.reset()
+
+    def search(self, embedding, top_k=5, filters=None):
+        """Nearest chunks for one query embedding, as NodeWithScore objects."""
+        from llama_index.core.schema import NodeWithScore
+        from llama_index.core.vector_stores import VectorStoreQuery
+        res = self.vector_store.query(VectorStoreQuery(
+            query_embedding=embedding,
+            similarity_top_k=top_k,
+            filters=build_filters(filters),
+        ))
+        nodes = res.nodes or []
+        similarities = res.similarities or [None] * len(nodes)
+        return [NodeWithScore(node=n, score=s) for n, s in zip(nodes, similarities)]
+
+_ENGINE = None
+_ENGINE_LOCK = threading.Lock()
+
+def get_engine():
+    """Return the shared MemoryEngine, creating it on first use."""
+    global _ENGINE
+    with _ENGINE_LOCK:
+        if _ENGINE is None:
+            _ENGINE = MemoryEngine()
+        return _ENGINE
+
+def index_stamp():
+    """Cheap version marker of the on-disk index (manifest mtime)."""
+    try:
+        return os.path.getmtime(MANIFEST_FILE)
+    except OSError:
+        return None
+
+def build_filters(filters):
+    """Turn a {key: value} dict into exact-match LlamaIndex metadata filters."""
+    if not filters:
+        return None
+    from llama_index.core.vector_stores import MetadataFilter, MetadataFilters
+    return MetadataFilters(filters=[MetadataFilter(key=k, value=v) for k, v in filters.items()])
+
+def file_hash(path):
+    """Content hash used to detect rewritten notes."""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 16), b''):
+            h.update(block)
+    return h.hexdigest()
 
-def sync_memory():
-    """Build or update the index from local markdown files."""
+def load_manifest():
+    """Load the per-file sync manifest (path -> mtime/size/hash); None if absent or outdated."""
+    if os.path.exists(MANIFEST_FILE):
+        with open(MANIFEST_FILE, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get("version") == MANIFEST_VERSION:
+            return manifest
+    return None
+
+def save_manifest(manifest):
+    """Persist the manifest atomically so an interrupted sync never leaves half a file."""
+    os.makedirs(os.path.dirname(MANIFEST_FILE), exist_ok=True)
+    tmp_path = MANIFEST_FILE + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, MANIFEST_FILE)
+
+def index_directories(config):
+    """Directories the memory indexes: `directories` plus `memory.extra_directories`."""
+    dirs = list((config.get('directories') or {}).values())
+    extra = (config.get('memory') or {}).get('extra_directories', DEFAULT_EXTRA_DIRS)
+    return dirs + [d for d in extra if d not in dirs]
+
+def normalize_path(path):
+    """Project-relative path with '/' separators, the key used by the manifest."""
+    return os.path.relpath(os.path.join(LOGS_DIR, path), LOGS_DIR).replace(os.sep, '/')
+
+def scan_markdown(target_dirs):
+    """Yield project-relative paths (with '/' separators) of every .md under target_dirs."""
+    for d in target_dirs:
+        full_path = os.path.join(LOGS_DIR, d)
+        if not os.path.exists(full_path):
+            continue
+        for root, _, files in os.walk(full_path):
+            for file in sorted(files):
+                if file.endswith('.md'):
+                    rel = os.path.relpath(os.path.join(root, file), LOGS_DIR)
+                    yield rel.replace(os.sep, '/')
+
+def diff_manifest(manifest, paths, scope=None):
+    """Compare the files on disk with the manifest.
+
+    mtime and size are checked first; the content hash is only computed
+    when they differ, so an untouched vault costs one stat() per file.
+    With `scope` (a set of paths) only those entries are considered and
+    every other manifest entry is carried over untouched.
+    Returns (added, modified, removed, new_manifest).
+    """
+    files = manifest.get("files", {}) if manifest else {}
+    added, modified = [], []
+    new_files = {}
+    if scope is not None:
+        new_files = {p: e for p, e in files.items() if p not in scope}
+    for path in paths:
+        st = os.stat(os.path.join(LOGS_DIR, path))
+        old = files.get(path)
+        if old and old["mtime"] == st.st_mtime and old["size"] == st.st_size:
+            new_files[path] = old
+            continue
+        digest = file_hash(os.path.join(LOGS_DIR, path))
+        if old is not None and old["hash"] == digest:
+            # Touched but not changed: keep its chunks, refresh the stat
+            new_files[path] = dict(old, mtime=st.st_mtime, size=st.st_size)
+            continue
+        new_files[path] = {"mtime": st.st_mtime, "size": st.st_size, "hash": digest}
+        if old is None:
+            added.append(path)
+        else:
+            modified.append(path)
+    removed = [p for p in files if p not in new_files and (scope is None or p in scope)]
+    return added, modified, removed, {"version": MANIFEST_VERSION, "files": new_files}
+
+def load_nodes(path):
+    """Read one note and split it into TextNodes at frontmatter/heading boundaries.
+
+    Node ids come from the chunk content (see md_chunker), and every node's
+    ref_doc_id is the note's project-relative path.
+    """
+    from llama_index.core.schema import NodeRelationship, RelatedNodeInfo, TextNode
+    from scripts.md_chunker import chunk_markdown
+    with open(os.path.join(LOGS_DIR, path), 'r', encoding='utf-8') as f:
+        text = f.read()
+    nodes = []
+    for chunk in chunk_markdown(path, text):
+        node = TextNode(
+            id_=chunk["id"],
+            text=chunk["text"],
+            metadata={
+                "file_path": path,
+                "file_name": os.path.basename(path),
+                "heading_path": chunk["heading_path"],
+                "chunk_hash": chunk["hash"],
+            },
+            excluded_embed_metadata_keys=["chunk_hash"],
+            excluded_llm_metadata_keys=["chunk_hash"],
+        )
+        node.relationships[NodeRelationship.SOURCE] = RelatedNodeInfo(node_id=path)
+        nodes.append(node)
+    return nodes
+
+def embed_nodes(embed_model, nodes):
+    """Attach embeddings to `nodes` with one batched call (cache hits cost nothing)."""
+    from llama_index.core.schema import MetadataMode
+    texts = [n.get_content(metadata_mode=MetadataMode.EMBED) for n in nodes]
+    for node, vector in zip(nodes, embed_model.embed_texts(texts)):
+        node.embedding = vector
+
+def sync_memory(paths=None):
+    """Incrementally update the index from local markdown files.
+
+    Notes are split into heading-level chunks with content-derived ids.
+    Only chunks that did not exist before are embedded; chunks that
+    disappeared (edited, or whose note was removed) are deleted from the
+    vector store and the lexical index.
+
+    `paths` limits the sync to those notes (used by `watch` and `board
+    archive`); by default every indexed directory is scanned.
+    """
     print("🧠 Starting Mind-OS Memory Sync (Offline Mode)...")
     
     # Define directories to scan based on config
-    target_dirs = list(CONFIG.get('directories', {}).values())
+    engine = get_engine()
+    target_dirs = index_directories(engine.config)
     
-    # Load documents
-    documents = []
-    for d in target_dirs:
-        full_path = os.path.join(LOGS_DIR, d)
-        if os.path.exists(full_path):
-            print(f"📄 Reading: {d}...")
-            reader = SimpleDirectoryReader(full_path, recursive=True, required_exts=[".md"])
-            documents.extend(reader.load_data())
+    manifest = load_manifest()
+    from scripts.lexical_index import LEXICAL_FILE, LexicalIndex
+    from scripts.centroid_index import CENTROID_FILE, CentroidIndex
+    rebuild_reason = None
+    if manifest is not None and manifest.get("backend", "chroma") != engine.store_signature:
+        rebuild_reason = f"Vector store switched to '{engine.store_signature}'"
+    elif manifest is not None and not os.path.exists(LEXICAL_FILE):
+        rebuild_reason = "Lexical index missing"
+    elif manifest is not None and not os.path.exists(CENTROID_FILE):
+        rebuild_reason = "File centroid index missing"
+    if rebuild_reason:
+        print(f"🔁 {rebuild_reason}, re-indexing all notes (embeddings come from the cache)...")
+        manifest = None
+    if paths is not None and manifest is not None:
+        scope = {normalize_path(p) for p in paths}
+        in_dirs = tuple(d.rstrip('/') + '/' for d in target_dirs)
+        present = sorted(p for p in scope
+                         if p.startswith(in_dirs) and p.endswith('.md')
+                         and os.path.isfile(os.path.join(LOGS_DIR, p)))
+        added, modified, removed, new_manifest = diff_manifest(manifest, present, scope)
+    else:
+        added, modified, removed, new_manifest = diff_manifest(manifest, scan_markdown(target_dirs))
+    new_manifest["backend"] = engine.store_signature
     
-    if not documents:
+    if not new_manifest["files"] and not removed:
         print("⚠️ No documents found to index.")
         return
-
-    storage_context = setup_engine()
-    
-    # Build index
-    print(f"⚡ Indexing {len(documents)} document fragments using FastEmbed...")
-    index = VectorStoreIndex.from_documents(
-        documents, storage_context=storage_context
-    )
     
-    print("✅ Sync complete. Memory is updated.")
+    if not (added or modified or removed) and manifest is not None:
+        print(f"✅ Memory is up to date ({len(new_manifest['files'])} files unchanged).")
+        return
 
-def query_memory(query_str):
-    """Retrieve relevant context for a given query."""
-    print(f"🔎 Querying memory for: '{query_str}'")
+    embed_model = engine.embed_model
+    embed_cache = embed_model.cache
+    embed_cache.reset_stats()
+    vector_store = engine.open_vector_store(reset=manifest is None)
+    lexical = LexicalIndex.load() if manifest is not None else LexicalIndex()
+    centroids = CentroidIndex.load() if manifest is not None else CentroidIndex()
+    old_files = manifest.get("files", {}) if manifest else {}
     
-    db = chromadb.PersistentClient(path=PERSIST_DIR)
-    chroma_collection = db.get_or_create_collection("mind_os_memory")
-    vector_store = ChromaVectorStore(chroma_collection=chroma_collection)
+    # Diff chunk ids per file: unchanged sections keep their id and vector
+    stale_ids, new_nodes, reused = [], [], 0
+    nodes_by_path = {}
+    for path in removed:
+        stale_ids.extend(old_files[path].get("chunks", []))
+    changed = added + modified
+    for path in changed:
+        nodes = nodes_by_path[path] = load_nodes(path)
+        old_ids = set(old_files.get(path, {}).get("chunks", []))
+        new_ids = [n.node_id for n in nodes]
+        stale_ids.extend(old_ids - set(new_ids))
+        fresh = [n for n in nodes if n.node_id not in old_ids]
+        reused += len(nodes) - len(fresh)
+        new_nodes.extend(fresh)
+        new_manifest["files"][path]["chunks"] = new_ids
     
-    index = VectorStoreIndex.from_vector_store(vector_store)
+    # Drop stale vectors first so a rewritten section never shows up twice
+    if stale_ids:
+        vector_store.delete_nodes(node_ids=stale_ids)
+        lexical.remove_ids(stale_ids)
     
-    # Simple retriever instead of full query engine (since LLM is None)
-    retriever = index.as_retriever(similarity_top_k=5)
-    nodes = retriever.retrieve(query_str)
+    centroids.remove(removed)
+    if changed:
+        print(f"⚡ Embedding {len(new_nodes)} new chunks from {len(changed)} files using FastEmbed...")
+        # Reused chunks come straight from the embedding cache; they are
+        # needed to recompute each changed note's centroid. Everything is
+        # embedded (possibly by worker processes) before the first write, so
+        # the store only ever sees one ordered insert from this process.
+        started = time.perf_counter()
+        embed_nodes(embed_model, [n for nodes in nodes_by_path.values() for n in nodes])
+        elapsed = time.perf_counter() - started
+        for path, nodes in nodes_by_path.items():
+            centroids.update(path, [n.embedding for n in nodes])
+        vector_store.add(new_nodes)
+        for node in new_nodes:
+            lexical.add(node.node_id, node.get_content(), node.metadata)
     
-    print("\n--- Memory Retrieval Result ---")
-    if not nodes:
-        print("No relevant memories found.")
-    else:
-        for i, node in enumerate(nodes):
-            print(f"[{i+1}] Source: {node.metadata.get('file_path', 'Unknown')}")
-            print(f"    Content: {node.text[:200]}...")
-            print("-" * 30)
-    print("-------------------------------\n")
+    # Chroma writes through (no-op here); the flat store buffers until persist
+    vector_store.persist(persist_path=None)
+    lexical.save()
+    centroids.save()
+    save_manifest(new_manifest)
+    engine.reset()
+    print(f"📊 Files: +{len(added)} ~{len(modified)} -{len(removed)} "
+          f"(unchanged {len(new_manifest['files']) - len(changed)}) | "
+          f"Chunks: +{len(new_nodes)} -{len(stale_ids)} (reused {reused})")
+    print(f"🗃️ Embedding cache: {embed_cache.hits} hits | {embed_cache.misses} misses")
+    if changed and embed_cache.misses:
+        cfg = engine.embedding_config
+        print(f"🚀 Throughput: {embed_cache.misses / max(elapsed, 1e-9):.1f} chunks/s "
+              f"({embed_cache.misses} embedded in {elapsed:.1f}s | batch_size={cfg.get('batch_size', 256)} "
+              f"threads={cfg.get('threads') or 'auto'} workers={cfg.get('workers', 1)})")
+    print("✅ Sync complete. Memory is updated.")
+
+def _lexical_hits(engine, ranked):
+    from scripts.memory_client import MemoryHit
+    docs = engine.lexical.docs
+    return [MemoryHit(docs[nid]["text"], docs[nid]["metadata"], score, nid) for nid, score in ranked]
+
+def _answer(engine, query_str, embedding, top_k, filters, mode):
+    """Run one query in `mode`; `embedding` is only needed for vector/hybrid."""
+    if mode == "vector":
+        return engine.search(embedding, top_k, filters)
+    if mode == "lexical":
+        return _lexical_hits(engine, engine.lexical.search(query_str, top_k, filters))
+    if mode != "hybrid":
+        raise ValueError(f"Unknown query mode: {mode} (expected one of {', '.join(QUERY_MODES)})")
+    # Hybrid: fuse a deeper slice of both rankings with reciprocal rank fusion
+    from scripts.lexical_index import reciprocal_rank_fusion
+    from scripts.memory_client import MemoryHit
+    depth = top_k * HYBRID_DEPTH
+    vector_nodes = {n.node.node_id: n for n in engine.search(embedding, depth, filters)}
+    lexical_ranked = engine.lexical.search(query_str, depth, filters)
+    fused = reciprocal_rank_fusion([list(vector_nodes), [nid for nid, _ in lexical_ranked]])
+    hits = []
+    for nid, score in fused[:top_k]:
+        if nid in vector_nodes:
+            n = vector_nodes[nid]
+            hits.append(MemoryHit(n.text, n.metadata, score, nid))
+        else:
+            hits.extend(_lexical_hits(engine, [(nid, score)]))
+    return hits
+
+def retrieve(query_str, top_k=5, filters=None, mode="vector"):
+    """Return the top_k nodes for a query without printing anything.
+
+    mode: "vector" (embedding search), "lexical" (BM25, no model load) or
+    "hybrid" (both, fused by reciprocal rank).
+    """
+    # Plain search instead of a query engine (we have no LLM)
+    engine = get_engine()
+    embedding = None
+    if mode != "lexical":
+        embedding = engine.embed_model.get_query_embedding(query_str)
+    return _answer(engine, query_str, embedding, top_k, filters, mode)
+
+def query_memory(query_str, mode="vector"):
+    """Retrieve relevant context for a given query."""
+    print(f"🔎 Querying memory for: '{query_str}' ({mode})")
+    nodes = retrieve(query_str, top_k=5, mode=mode)
+    from scripts.memory_client import print_nodes
+    print_nodes(nodes)
     return nodes
 
+def retrieve_batch(queries):
+    """Run many queries against one opened store with one batched embedding call.
+
+    `queries` is a list of dicts with `text`, optional `top_k`, `filters`
+    and `mode`. Returns one list of {path, score, text} per query, in order.
+    """
+    engine = get_engine()
+    needs_vector = [q for q in queries if q.get("mode", "vector") != "lexical"]
+    embeddings = {}
+    if needs_vector:
+        vectors = engine.embed_model.get_query_embeddings([q["text"] for q in needs_vector])
+        embeddings = {id(q): v for q, v in zip(needs_vector, vectors)}
+    results = []
+    for q in queries:
+        nodes = _answer(engine, q["text"], embeddings.get(id(q)), int(q.get("top_k", 5)),
+                        q.get("filters"), q.get("mode", "vector"))
+        results.append([
+            {"path": n.metadata.get("file_path"), "score": n.score, "text": n.text}
+            for n in nodes
+        ])
+    return results
+
+def route_candidates(message, top_k=ROUTE_CANDIDATES):
+    """Rank notes for a thought by cosine to each note's centroid: [(path, score)]."""
+    engine = get_engine()
+    return engine.centroids.search(engine.embed_model.get_query_embedding(message), top_k)
+
 def semantic_route(message):
     """Route a message to the most semantically relevant file."""
     print(f"🧭 Routing thought: '{message[:50]}...'")
     
-    db = chromadb.PersistentClient(path=PERSIST_DIR)
-    chroma_collection = db.get_or_create_collection("mind_os_memory")
-    vector_store = ChromaVectorStore(chroma_collection=chroma_collection)
-    index = VectorStoreIndex.from_vector_store(vector_store)
-    
-    retriever = index.as_retriever(similarity_top_k=1)
-    nodes = retriever.retrieve(message)
+    candidates = route_candidates(message)
+    min_score = float((get_engine().config.get('routing') or {}).get('min_score', ROUTE_MIN_SCORE))
+    for rank, (path, score) in enumerate(candidates, 1):
+        print(f"   {rank}. {score:.3f}  {path}")
     
-    if not nodes:
-        print("⚠️ No relevant file found. Defaulting to '增量引擎/收集箱.md'")
-        target_file = os.path.join(LOGS_DIR, "增量引擎", "收集箱.md")
+    if not candidates or candidates[0][1] < min_score:
+        print(f"⚠️ No file above confidence {min_score:.2f}. Defaulting to '{INBOX_FILE}'")
+        target_file = INBOX_FILE
     else:
-        target_file = nodes[0].metadata.get('file_path')
+        target_file = candidates[0][0]
         print(f"🎯 Matched: {os.path.basename(target_file)}")
 
     # Ensure target directory exists
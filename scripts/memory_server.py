@@ -0,0 +1,82 @@
+"""
+Mind-OS 常驻记忆服务 - 让嵌入模型与向量库保持热启动
+
+Run `python mind-os.py serve` once; `query`, `capture` and `report` then
+talk to it over a localhost socket (one JSON object per line) instead of
+re-loading the ONNX model and re-opening Chroma on every call.
+"""
+import os
+import sys
+import json
+import time
+import threading
+import socketserver
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+class MemoryRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+        try:
+            request = json.loads(line.decode('utf-8'))
+            reply = self.server.dispatch(request)
+            reply["ok"] = True
+        except Exception as e:
+            reply = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        self.wfile.write(json.dumps(reply, ensure_ascii=False).encode('utf-8') + b"\n")
+
+class MemoryServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, address):
+        super().__init__(address, MemoryRequestHandler)
+        from scripts import memory_engine
+        self.memory = memory_engine
+        self.engine = memory_engine.get_engine()
+        # Serialise index access: the handles are shared, Chroma is not re-entrant
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.requests = 0
+
+    def dispatch(self, request):
+        op = request.get("op")
+        with self.lock:
+            self.requests += 1
+            self.engine.refresh_if_stale()
+            if op == "ping":
+                return {"status": {"uptime": round(time.time() - self.started, 1),
+                                   "requests": self.requests, "pid": os.getpid()}}
+            if op == "query":
+                nodes = self.memory.retrieve(request["text"], top_k=int(request.get("top_k", 5)),
+                                             mode=request.get("mode", "vector"))
+                return {"results": [{"text": n.text, "metadata": n.metadata, "score": n.score,
+                                     "node_id": getattr(n, "node_id", None)} for n in nodes]}
+            if op == "batch":
+                return {"results": self.memory.retrieve_batch(request["queries"])}
+            if op == "route":
+                return {"target_file": self.memory.semantic_route(request["message"])}
+        raise ValueError(f"Unknown op: {op}")
+
+def serve():
+    """Start the warm memory server in the foreground (Ctrl+C to stop)."""
+    os.chdir(PROJECT_ROOT)  # note paths in the index are project-relative
+    from scripts.memory_client import server_address
+    host, port = server_address()
+    print("🔥 Warming up memory engine (model + vector store)...")
+    server = MemoryServer((host, port))
+    server.memory.retrieve("warmup", top_k=1)
+    server.engine.centroids
+    print(f"🧠 Memory server listening on {host}:{port} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Memory server stopped.")
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    sys.path.insert(0, PROJECT_ROOT)
+    serve()
@@ -0,0 +1,113 @@
+"""
+Mind-OS 记忆监听 - 持续增量索引
+
+`python mind-os.py watch` polls the indexed directories (the configured
+`directories` plus `memory.extra_directories`, i.e. 对话记录/ and
+增量引擎/ by default), debounces bursts of edits and re-syncs only the
+notes that changed. The model stays loaded between syncs, so each update
+costs the embedding of the edited chunks only.
+
+Status (queue depth, index lag, last sync) is written to
+`.mind_os/watch_status.json`; `python mind-os.py watch --status` prints it.
+"""
+import os
+import json
+import time
+import datetime
+
+STATUS_FILE = "./.mind_os/watch_status.json"
+DEFAULT_INTERVAL = 1.0   # seconds between directory polls
+DEFAULT_DEBOUNCE = 2.0   # quiet period before a burst of edits is synced
+DEFAULT_MAX_DELAY = 30.0 # sync anyway once the oldest pending edit is this old
+
+def snapshot(target_dirs):
+    """{path: (mtime, size)} of every indexed note."""
+    from scripts.memory_engine import LOGS_DIR, scan_markdown
+    state = {}
+    for path in scan_markdown(target_dirs):
+        try:
+            st = os.stat(os.path.join(LOGS_DIR, path))
+        except OSError:
+            continue  # deleted between walk and stat
+        state[path] = (st.st_mtime, st.st_size)
+    return state
+
+def write_status(status):
+    os.makedirs(os.path.dirname(STATUS_FILE), exist_ok=True)
+    tmp_path = STATUS_FILE + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(status, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, STATUS_FILE)
+
+def show_status():
+    """Print the last status written by a running (or stopped) watcher."""
+    if not os.path.exists(STATUS_FILE):
+        print("📭 Watcher has never run. Start it with `python mind-os.py watch`.")
+        return
+    with open(STATUS_FILE, 'r', encoding='utf-8') as f:
+        status = json.load(f)
+    age = time.time() - status.get("updated_at", 0)
+    print(f"👀 Watcher pid {status.get('pid')} | state: {status.get('state')} "
+          f"(updated {age:.0f}s ago)")
+    print(f"   Queue depth: {status.get('queue_depth', 0)} | Index lag: {status.get('lag_seconds', 0):.1f}s")
+    if status.get("last_sync"):
+        print(f"   Last sync: {status['last_sync']} ({status.get('last_sync_files', 0)} files, "
+              f"{status.get('last_sync_ms', 0):.0f} ms) | Total synced: {status.get('synced_files', 0)}")
+
+def watch(interval=None, debounce=None, max_delay=None):
+    """Poll, debounce and incrementally sync until interrupted."""
+    from scripts.memory_engine import get_engine, index_directories, sync_memory
+    engine = get_engine()
+    cfg = engine.config.get('watch') or {}
+    interval = interval or float(cfg.get('interval', DEFAULT_INTERVAL))
+    debounce = debounce or float(cfg.get('debounce', DEFAULT_DEBOUNCE))
+    max_delay = max_delay or float(cfg.get('max_delay', DEFAULT_MAX_DELAY))
+    target_dirs = index_directories(engine.config)
+
+    # Catch up on anything edited while nobody was watching
+    sync_memory()
+    engine.embed_model  # keep the model warm between bursts
+    previous = snapshot(target_dirs)
+    pending = {}  # path -> time the change was first seen
+    last_event = 0.0
+    status = {"pid": os.getpid(), "state": "idle", "queue_depth": 0, "lag_seconds": 0.0,
+              "synced_files": 0, "last_sync": None}
+    print(f"👀 Watching {', '.join(target_dirs)} (poll {interval}s, debounce {debounce}s). Ctrl+C to stop.")
+    try:
+        while True:
+            now = time.time()
+            current = snapshot(target_dirs)
+            for path in set(previous) | set(current):
+                if previous.get(path) != current.get(path):
+                    pending.setdefault(path, now)
+                    last_event = now
+            previous = current
+
+            oldest = min(pending.values()) if pending else None
+            due = pending and (now - last_event >= debounce or now - oldest >= max_delay)
+            if due:
+                batch = sorted(pending)
+                status.update(state="syncing", queue_depth=len(batch), lag_seconds=now - oldest)
+                write_status(dict(status, updated_at=now))
+                started = time.perf_counter()
+                sync_memory(paths=batch)
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                for path in batch:
+                    pending.pop(path, None)
+                status.update(
+                    last_sync=datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                    last_sync_files=len(batch), last_sync_ms=elapsed_ms,
+                    synced_files=status["synced_files"] + len(batch),
+                )
+                print(f"🔄 Synced {len(batch)} file(s) in {elapsed_ms:.0f} ms "
+                      f"(lag {now - oldest:.1f}s, queue {len(pending)})")
+
+            oldest = min(pending.values()) if pending else None
+            status.update(state="pending" if pending else "idle", queue_depth=len(pending),
+                          lag_seconds=(time.time() - oldest) if oldest else 0.0)
+            write_status(dict(status, updated_at=time.time()))
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        status.update(state="stopped")
+        write_status(dict(status, updated_at=time.time()))
+        print("\n👋 Watcher stopped.")